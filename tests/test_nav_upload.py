@@ -0,0 +1,164 @@
+"""Behaviour tests for the NAV upload bookkeeping: dedup, Sheet seeding, digest skip and flush_pending."""
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from nav_update_scheduler import Config, DataCache, DataUpdater, MarketData
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAYLOAD = (FIXTURES / "NAVAll_quoted.txt").read_bytes()
+DATE = "2025-07-25" # Every scheme in the fixture is dated 25-Jul-2025
+CODES = ["120828", "120829", "125497"]
+NAV_SHEET = (Config.Files.NAV_SHEET_ID, Config.Files.NAV_WORKSHEET_NAME)
+
+
+class FakeSheets:
+    """
+    Stands in for GoogleSheetsManager. Writes at most limits[(sheet_id, worksheet)] rows
+    per worksheet and serves sheet_rows to get_range (None simulates a failed read).
+    """
+    def __init__(self, sheet_rows=(), limits=None):
+        self.sheet_rows = sheet_rows
+        self.limits = limits or {}
+        self.appended = []
+
+    async def batch_append(self, session, updates):
+        written = {}
+        for sheet_id, sheet_name, rows in updates:
+            key = (sheet_id, sheet_name)
+            self.appended.append((key, rows))
+            written[key] = min(len(rows), self.limits.get(key, len(rows)))
+        return written
+
+    def get_range(self, sheet_id, sheet_name, a1_range):
+        return None if self.sheet_rows is None else [list(row) for row in self.sheet_rows]
+
+
+class FakeFetcher:
+    """Serves the same AMFI payload for every request; flush_pending only reads .session."""
+    session = None
+
+    def __init__(self, payload=PAYLOAD):
+        self.payload = payload
+
+    async def fetch_bytes(self, url, params=None, headers=None):
+        return self.payload
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_dir(tmp_path, monkeypatch):
+    # DataUpdater creates Config.DATA_DIR relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+async def nav_run(cache, sheets, payload=PAYLOAD):
+    """One scheduler run with only the NAV updater: update_nav, then flush_pending."""
+    updater = DataUpdater(cache, sheets, datetime.now())
+    fetcher = FakeFetcher(payload)
+    updated = await updater.update_nav(fetcher)
+    flushed = await updater.flush_pending(fetcher)
+    return updated, flushed
+
+
+def appended_codes(sheets):
+    return [row[1] for key, rows in sheets.appended if key == NAV_SHEET for row in rows]
+
+
+async def uploaded_codes(cache):
+    return sorted(code for code, _ in await cache.get_uploaded_nav_keys({DATE}))
+
+
+def test_partial_write_is_retried_from_where_it_stopped():
+    async def scenario():
+        async with DataCache(":memory:") as cache:
+            first = FakeSheets(limits={NAV_SHEET: 1})
+            assert await nav_run(cache, first) == (True, False)
+            # Only the row that reached the sheet is recorded; the run is not marked finished
+            assert await uploaded_codes(cache) == CODES[:1]
+            assert await cache.get("NAV_Payload_Hash") is None
+            assert await cache.get("NAV_Update_Status") is None
+
+            second = FakeSheets()
+            assert await nav_run(cache, second) == (True, True)
+            assert appended_codes(second) == CODES[1:]
+            assert await uploaded_codes(cache) == CODES
+            assert await cache.get("NAV_Payload_Hash") is not None
+    asyncio.run(scenario())
+
+
+def test_unchanged_file_is_skipped():
+    async def scenario():
+        async with DataCache(":memory:") as cache:
+            assert await nav_run(cache, FakeSheets()) == (True, True)
+
+            again = FakeSheets(sheet_rows=None) # Would fail the run if the sheet were consulted
+            assert await nav_run(cache, again) == (True, True)
+            assert again.appended == []
+    asyncio.run(scenario())
+
+
+def test_changed_file_appends_only_new_records():
+    async def scenario():
+        async with DataCache(":memory:") as cache:
+            assert await nav_run(cache, FakeSheets()) == (True, True)
+
+            extra = b"119551;INF209KA12Z1;-;Aditya Birla Sun Life Fund - Growth;102.5;25-Jul-2025\r\n"
+            sheets = FakeSheets()
+            assert await nav_run(cache, sheets, PAYLOAD + extra) == (True, True)
+            assert appended_codes(sheets) == ["119551"]
+    asyncio.run(scenario())
+
+
+def test_first_run_seeds_uploaded_records_from_the_sheet():
+    async def scenario():
+        async with DataCache(":memory:") as cache:
+            sheets = FakeSheets(sheet_rows=[
+                ["Date", "Fund Code", "Fund Name", "NAV"],
+                [DATE, "120828"],
+                ["2025-07-24", "120829"], # Same scheme, older date: still needs today's row
+            ])
+            assert await nav_run(cache, sheets) == (True, True)
+            assert appended_codes(sheets) == CODES[1:]
+            assert await uploaded_codes(cache) == CODES
+    asyncio.run(scenario())
+
+
+def test_failed_sheet_read_uploads_nothing():
+    async def scenario():
+        async with DataCache(":memory:") as cache:
+            sheets = FakeSheets(sheet_rows=None)
+            assert await nav_run(cache, sheets) == (False, True)
+            assert sheets.appended == []
+            assert not await cache.has_uploaded_navs()
+            assert await cache.get("NAV_Payload_Hash") is None
+    asyncio.run(scenario())
+
+
+def test_cache_entries_commit_only_for_fully_written_worksheets():
+    async def scenario():
+        async with DataCache(":memory:") as cache:
+            updater = DataUpdater(cache, None, datetime.now())
+            gold = (Config.Files.GOLD_SHEET_ID, Config.Files.GOLD_WORKSHEET_NAME)
+            fred = (Config.Files.FRED_SHEET_ID, Config.Files.FRED_WORKSHEET_NAME)
+            updater._queue_rows(*gold, [["2025-07-25", 1.0, "GoldAPI.io"]])
+            updater._queue_cache(*gold, "Gold", MarketData(updater.run_ts, 1.0, "GoldAPI.io"))
+            updater._queue_rows(*fred, [["2025-07-01", "CPI", 2.0, "FRED"]])
+            updater._queue_cache(*fred, "FRED_CPI", MarketData(updater.run_ts, 2.0, "FRED"))
+            updater.gs_manager = FakeSheets(limits={fred: 0})
+
+            assert await updater.flush_pending(FakeFetcher()) is False
+            assert (await cache.get("Gold")).value == 1.0
+            assert await cache.get("FRED_CPI") is None
+    asyncio.run(scenario())
+
+
+def test_upload_records_for_dates_outside_the_file_are_pruned():
+    async def scenario():
+        async with DataCache(":memory:") as cache:
+            await cache.mark_nav_uploaded([("120828", "2025-07-24")])
+            assert await nav_run(cache, FakeSheets()) == (True, True)
+            assert await cache.get_uploaded_nav_keys({"2025-07-24"}) == set()
+            assert await uploaded_codes(cache) == CODES
+    asyncio.run(scenario())
@@ -0,0 +1,24 @@
+"""Tests for DataUpdater._parse_amfi_nav against saved AMFI NAVAll.txt samples."""
+from pathlib import Path
+
+import nav_update_scheduler
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def test_quote_in_scheme_name_does_not_swallow_rows():
+    # 120828's name opens a '"' that is never closed; 120829's name has a stray one.
+    # Parsed with CSV quoting, everything between them would collapse into one field.
+    raw = (FIXTURES / "NAVAll_quoted.txt").read_bytes()
+
+    dates, codes, names, navs = nav_update_scheduler.DataUpdater._parse_amfi_nav(raw)
+
+    # 120830 has an "N.A." NAV and is dropped; section and AMC title lines never become rows
+    assert codes == ["120828", "120829", "125497"]
+    assert names == [
+        '"quant Small Cap Fund - Growth Option - Direct Plan',
+        'Quant Small Cap Fund - 6" Special Series - Regular',
+        "SBI Small Cap Fund - Direct Plan - Growth",
+    ]
+    assert navs == [262.4183, 18.1102, 187.5423]
+    assert dates == ["2025-07-25"] * 3